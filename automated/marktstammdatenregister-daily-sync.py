@@ -12,6 +12,7 @@ Usage:
     python marktstammdatenregister-daily-sync.py --rebuild # clear tables, re-insert everything
 """
 
+import logging
 import os
 import sys
 import subprocess
@@ -33,8 +34,19 @@ REBUILD = "--rebuild" in sys.argv
 FULL_LOAD = "--full" in sys.argv or REBUILD
 
 
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [daily-sync] %(levelname)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    stream=sys.stdout,
+)
+logger = logging.getLogger("daily-sync")
+
+
 def log(msg, level="INFO"):
-    print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} [daily-sync] {level}: {msg}")
+    # Timestamp formatting happens in the handler, only for records that
+    # are actually emitted.
+    logger.log(getattr(logging, level, logging.INFO), msg)
 
 
 def download_mastr_data():
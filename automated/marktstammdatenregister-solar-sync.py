@@ -12,12 +12,15 @@ Usage:
     python marktstammdatenregister-solar-sync.py --skip-download  # skip MaStR download (parent already did it)
 """
 
+import logging
 import os
-import math
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from open_mastr import Mastr
@@ -30,6 +33,40 @@ except ImportError:
 
 load_dotenv()
 
+try:
+    import orjson
+
+    def _json_body(payload):
+        """Serialize a request body to bytes (orjson when available)."""
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    import json
+
+    def _json_body(payload):
+        """Serialize a request body to bytes (stdlib fallback)."""
+        return json.dumps(payload).encode()
+
+
+def _iter_json_array(records):
+    """
+    Stream a JSON array body one record at a time.
+
+    requests sends a generator body with chunked transfer encoding, so peak
+    memory for a POST/PATCH stays at one serialized record instead of the
+    whole batch.
+    """
+    yield b"["
+    first = True
+    for r in records:
+        if first:
+            first = False
+        else:
+            yield b","
+        yield _json_body(r)
+    yield b"]"
+
+
+
 DIRECTUS_URL = os.getenv("DIRECTUS_API_URL")
 DIRECTUS_TOKEN = os.getenv("DIRECTUS_API_TOKEN")
 TABLE_NAME = "energy_solar_units"
@@ -46,9 +83,37 @@ HEADERS = {
 
 THRESHOLD_DATE = datetime.today() - timedelta(days=UPDATE_DAYS_BACK)
 
+MAX_WORKERS = int(os.getenv("DIRECTUS_MAX_WORKERS", 8))
+
+# One pooled session for all Directus I/O, mirroring the storage sync:
+# persistent connections amortize the TCP+TLS handshake, and the adapter
+# retries transient failures on idempotent requests. POST/PATCH keep their
+# own retry loop in batch_upsert because their streamed bodies cannot be
+# replayed by the adapter.
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=MAX_WORKERS * 2,
+        pool_maxsize=MAX_WORKERS * 2,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504]),
+    ),
+)
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [solar-sync] %(levelname)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    stream=sys.stdout,
+)
+logger = logging.getLogger("solar-sync")
+
 
 def log(msg, level="INFO"):
-    print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} [solar-sync] {level}: {msg}")
+    # Timestamp formatting happens in the handler, only for records that
+    # are actually emitted.
+    logger.log(getattr(logging, level, logging.INFO), msg)
 
 
 # ---------------------------------------------------------------------------
@@ -164,56 +229,67 @@ def map_to_directus_schema(df):
         if source_col in df.columns and target_col not in actual_mapping.values():
             actual_mapping[source_col] = target_col
 
-    records = []
-    for _, row in df.iterrows():
-        mastr_id = None
-        for col in ["EinheitMastrNummer", "mastr_id", "unit_registration_id"]:
-            if col in df.columns and pd.notna(row.get(col)):
-                mastr_id = str(row[col]).strip()
-                break
-        if not mastr_id:
-            continue
-
-        record = {"id": mastr_id, "country": "DE"}
-
-        for source_col, target_col in actual_mapping.items():
-            if target_col == "id":
-                continue
-            value = row.get(source_col)
-            if pd.isna(value):
-                record[target_col] = None
-                continue
-
-            if target_col in ("power_kw", "net_power_kw"):
-                try:
-                    record[target_col] = float(str(value).replace(",", "."))
-                except (ValueError, TypeError):
-                    record[target_col] = None
-            elif target_col == "module_count":
-                try:
-                    record[target_col] = math.floor(float(str(value).replace(",", ".")))
-                except (ValueError, TypeError):
-                    record[target_col] = None
-            elif target_col == "storage_installed":
-                if isinstance(value, bool):
-                    record[target_col] = value
-                elif str(value) in ["1", "true", "True", "ja", "Ja"]:
-                    record[target_col] = True
-                else:
-                    record[target_col] = False
-            elif target_col in ("commissioning_date", "last_update", "shutdown_date"):
-                if isinstance(value, pd.Timestamp):
-                    record[target_col] = value.strftime("%Y-%m-%d")
-                else:
-                    record[target_col] = str(value)[:10] if value else None
-            elif target_col == "status":
-                record[target_col] = STATUS_CODES.get(str(value), str(value)) if value else None
-            elif target_col == "type":
-                record[target_col] = TYPE_CODES.get(str(value), str(value)) if value else None
-            else:
-                record[target_col] = str(value) if value else None
+    id_cols = [c for c in ["EinheitMastrNummer", "mastr_id", "unit_registration_id"] if c in df.columns]
+    if not id_cols:
+        log("No ID column found!", level="ERROR")
+        return []
+
+    # Build the records column-wise instead of growing a dict per row via
+    # iterrows; the dicts are only materialized once at the very end.
+    mapped = df[list(actual_mapping.keys())].rename(columns=actual_mapping).copy()
+    ids = df[id_cols].bfill(axis=1).iloc[:, 0]
+    mapped["id"] = ids.astype(str).str.strip()
+    mapped = mapped[ids.notna() & ~mapped["id"].isin(["", "nan", "None"])].copy()
+    mapped["country"] = "DE"
+
+    float_cols = [c for c in ("power_kw", "net_power_kw") if c in mapped.columns]
+    if float_cols:
+        mapped[float_cols] = (
+            mapped[float_cols]
+            .astype("string[pyarrow]")
+            .apply(lambda s: pd.to_numeric(s.str.replace(",", ".", regex=False), errors="coerce"))
+        )
+
+    if "module_count" in mapped.columns:
+        counts = pd.to_numeric(
+            mapped["module_count"].astype("string[pyarrow]").str.replace(",", ".", regex=False),
+            errors="coerce",
+        )
+        mapped["module_count"] = np.floor(counts).astype("Int64").astype(object)
 
-        records.append(record)
+    if "storage_installed" in mapped.columns:
+        na_mask = mapped["storage_installed"].isna()
+        mapped["storage_installed"] = (
+            mapped["storage_installed"].astype(str).isin(["1", "true", "True", "ja", "Ja"]).astype(object)
+        )
+        mapped.loc[na_mask, "storage_installed"] = None
+
+    for col in {"commissioning_date", "last_update", "shutdown_date"} & set(mapped.columns):
+        na_mask = mapped[col].isna()
+        mapped[col] = mapped[col].astype(str).str.slice(0, 10)
+        mapped.loc[na_mask | mapped[col].eq(""), col] = None
+
+    for col, codes in (("status", STATUS_CODES), ("type", TYPE_CODES)):
+        if col in mapped.columns:
+            na_mask = mapped[col].isna() | mapped[col].eq("")
+            vals = mapped[col].astype(str)
+            mapped[col] = vals.map(codes).fillna(vals).astype(object)
+            mapped.loc[na_mask, col] = None
+
+    string_cols = {
+        "name", "orientation", "federal_state", "district", "municipality",
+        "region", "postcode", "grid_operator_review_status",
+    }
+    for col in string_cols & set(mapped.columns):
+        na_mask = mapped[col].isna() | mapped[col].eq("")
+        mapped.loc[~na_mask, col] = mapped.loc[~na_mask, col].astype(str)
+        mapped.loc[na_mask, col] = None
+
+    records = mapped.to_dict("records")
+    for r in records:
+        for k, v in r.items():
+            if v is not None and pd.isna(v):
+                r[k] = None
 
     log(f"Mapped {len(records)} records.")
     return records
@@ -224,22 +300,34 @@ def map_to_directus_schema(df):
 # ---------------------------------------------------------------------------
 
 def get_existing_ids(ids):
-    existing = set()
-    for i in range(0, len(ids), 100):
-        chunk = ids[i:i + 100]
+    """Return the subset of ids already present in Directus."""
+    # These lookups are pure round-trip time, so run the chunk queries
+    # concurrently over the pooled session. MaStR IDs are ~15 chars, plus
+    # an URL-encoded comma each (3 bytes): 300 IDs per chunk is ~5.4 KB of
+    # query string, safely under the common 8 KB request-line limit.
+    chunk_size = 300
+
+    def fetch_chunk(chunk):
         try:
-            r = requests.get(
+            r = SESSION.get(
                 f"{DIRECTUS_URL}/items/{TABLE_NAME}",
                 headers=HEADERS,
                 params={"filter[id][_in]": ",".join(chunk), "fields": "id", "limit": -1},
                 timeout=60,
             )
             if r.status_code == 200:
-                existing.update(item["id"] for item in r.json().get("data", []))
-            else:
-                log(f"Error querying existing IDs: {r.status_code}", level="WARNING")
+                return {item["id"] for item in r.json().get("data", [])}
+            log(f"Error querying existing IDs: {r.status_code}", level="WARNING")
         except Exception as e:
             log(f"Error checking existing IDs: {e}", level="WARNING")
+        return set()
+
+    chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+    existing = set()
+    if chunks:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(chunks))) as pool:
+            for found in pool.map(fetch_chunk, chunks):
+                existing |= found
     return existing
 
 
@@ -249,8 +337,8 @@ def batch_upsert(batch, op, max_retries=3):
     url = f"{DIRECTUS_URL}/items/{TABLE_NAME}"
     for attempt in range(max_retries):
         try:
-            fn = requests.post if op == "insert" else requests.patch
-            r = fn(url, json=batch, headers=HEADERS, timeout=120)
+            fn = SESSION.post if op == "insert" else SESSION.patch
+            r = fn(url, data=_iter_json_array(batch), headers=HEADERS, timeout=120)
             if r.status_code in [200, 201, 204]:
                 return len(batch)
             elif r.status_code == 503:
@@ -271,7 +359,7 @@ def clear_table():
     page_size, offset = 10000, 0
     while True:
         try:
-            r = requests.get(
+            r = SESSION.get(
                 f"{DIRECTUS_URL}/items/{TABLE_NAME}",
                 headers=HEADERS,
                 params={"fields": "id", "limit": page_size, "offset": offset},
@@ -304,7 +392,7 @@ def clear_table():
         batch_num = i // BATCH_SIZE + 1
         batch = all_ids[i:i + BATCH_SIZE]
         try:
-            r = requests.delete(
+            r = SESSION.delete(
                 f"{DIRECTUS_URL}/items/{TABLE_NAME}", headers=HEADERS, json=batch, timeout=120
             )
             if r.status_code in [200, 204]:
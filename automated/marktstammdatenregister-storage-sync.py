@@ -13,12 +13,17 @@ Usage:
 """
 
 import codecs
+import logging
 import os
+import sqlite3
 import sys
 import time
 import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from xml.etree.ElementTree import iterparse as xml_iterparse
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -35,9 +40,69 @@ except ImportError:
 
 load_dotenv()
 
+try:
+    import orjson
+
+    def _json_body(payload):
+        """Serialize a request body to bytes (orjson when available)."""
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    def _json_loads(content):
+        """Parse a response body (orjson when available)."""
+        return orjson.loads(content)
+except ImportError:
+    import json
+
+    def _json_body(payload):
+        """Serialize a request body to bytes (stdlib fallback)."""
+        return json.dumps(payload).encode()
+
+    def _json_loads(content):
+        """Parse a response body (stdlib fallback)."""
+        return json.loads(content)
+
+
+def _iter_json_array(records):
+    """
+    Stream a JSON array body one record at a time.
+
+    requests sends a generator body with chunked transfer encoding, so peak
+    memory for a POST/PATCH stays at one serialized record instead of the
+    whole batch.
+    """
+    yield b"["
+    first = True
+    for r in records:
+        if first:
+            first = False
+        else:
+            yield b","
+        yield _json_body(r)
+    yield b"]"
+
+
+def _gzip_stream(chunks):
+    """
+    Gzip-compress a byte-chunk stream on the fly.
+
+    Keeps the O(1) memory profile of _iter_json_array while cutting the
+    bytes on the wire roughly tenfold for these repetitive JSON bodies.
+    Level 1 keeps the compression CPU cost negligible next to network time.
+    """
+    gz = zlib.compressobj(level=1, wbits=31)
+    for chunk in chunks:
+        out = gz.compress(chunk)
+        if out:
+            yield out
+    yield gz.flush()
+
+
+
 DIRECTUS_URL = os.getenv("DIRECTUS_API_URL")
 DIRECTUS_TOKEN = os.getenv("DIRECTUS_API_TOKEN")
 TABLE_NAME = "energy_storage_units"
+# Tunable via env; per-batch wall times are logged by sync_to_directus so the
+# size/throughput curve can be probed. Bounded by Directus' QUERY_LIMIT_MAX.
 BATCH_SIZE = int(os.getenv("DIRECTUS_BATCH_SIZE", 1000))
 UPDATE_DAYS_BACK = int(os.getenv("UPDATE_DAYS_BACK", 10))
 SKIP_DOWNLOAD = "--skip-download" in sys.argv
@@ -51,12 +116,69 @@ HEADERS = {
 
 THRESHOLD_DATE = datetime.today() - timedelta(days=UPDATE_DAYS_BACK)
 
+MAX_WORKERS = int(os.getenv("DIRECTUS_MAX_WORKERS", 8))
+
+# One pooled session for all Directus I/O: persistent connections amortize the
+# TCP+TLS handshake across batches. The adapter retries transient failures on
+# idempotent requests; POST/PATCH keep their own retry loop in batch_upsert
+# because their bodies are streamed generators and cannot be replayed by the
+# adapter.
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=MAX_WORKERS * 2,
+        pool_maxsize=MAX_WORKERS * 2,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504]),
+    ),
+)
+
 # One entry manually restored by OET after filter 4 (known valid large unit)
 _OET_FILTER4_EXCEPTIONS = {"SSE978006940074"}
 
+# Columns actually consumed by apply_plausibility_checks and
+# map_to_directus_schema. storage_extended carries ~100 columns, so
+# projecting in SQL keeps the DataFrame (and every downstream op) ~3x smaller.
+NEEDED_COLUMNS = [
+    "EinheitMastrNummer", "NameStromerzeugungseinheit", "EinheitBetriebsstatus",
+    "Inbetriebnahmedatum", "DatumLetzteAktualisierung", "DatumEndgueltigeStilllegung",
+    "GeplantesInbetriebnahmedatum", "Energietraeger", "Technologie",
+    "Batterietechnologie", "Pumpspeichertechnologie", "Bruttoleistung",
+    "Nettonennleistung", "NutzbareSpeicherkapazitaet", "PumpbetriebLeistungsaufnahme",
+    "ZugeordneteWirkleistungWechselrichter", "AcDcKoppelung",
+    "AnschlussAnHoechstOderHochSpannung", "Einspeisungsart",
+    "AnlagenbetreiberMastrNummer", "GemeinsamRegistrierteSolareinheitMastrNummer",
+    "Einsatzort", "Bundesland", "Landkreis", "Gemeinde", "Gemeindeschluessel",
+    "Postleitzahl", "Breitengrad", "Laengengrad", "NetzbetreiberpruefungStatus",
+    "SpeMastrNummer",
+]
+
+
+# Fields the bulk export encodes as numeric Katalogwerte IDs. The pipeline
+# compares and ships the decoded German text (e.g. Technologie "Batterie",
+# EinheitBetriebsstatus "In Betrieb"), so these must be decoded when reading
+# units straight from the zip. NetzbetreiberpruefungStatus stays raw: the
+# OET filter compares its "0"/"1" codes directly.
+CATALOG_COLUMNS = [
+    "EinheitBetriebsstatus", "Energietraeger", "Technologie",
+    "Batterietechnologie", "Pumpspeichertechnologie", "AcDcKoppelung",
+    "Einspeisungsart", "Bundesland", "Einsatzort",
+]
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    stream=sys.stdout,
+)
+logger = logging.getLogger("storage-sync")
+
 
 def log(msg, level="INFO"):
-    print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} {level}: {msg}")
+    # Timestamp formatting happens in the handler, only for records that
+    # are actually emitted.
+    logger.log(getattr(logging, level, logging.INFO), msg)
 
 
 # ---------------------------------------------------------------------------
@@ -69,48 +191,177 @@ def _find_latest_zip():
     return candidates[-1] if candidates else None
 
 
+def _parse_capacity_file(zip_path, member):
+    """
+    Parse one AnlagenStromSpeicher_*.xml member of the zip.
+
+    Runs in a worker process (XML parsing is CPU-bound, so threads would not
+    help here). Takes plain strings and returns a plain dict so everything
+    crossing the process boundary stays picklable.
+    """
+    spe_to_cap = {}
+    with zipfile.ZipFile(zip_path) as zf:
+        with zf.open(member) as raw:
+            reader = codecs.getreader("utf-16")(raw)
+            record = None
+            for event, elem in xml_iterparse(reader, events=("start", "end")):
+                tag = elem.tag
+                if event == "start" and tag == "AnlageStromSpeicher":
+                    record = {}
+                elif event == "end" and record is not None:
+                    if tag in ("MaStRNummer", "NutzbareSpeicherkapazitaet"):
+                        record[tag] = elem.text
+                        elem.clear()
+                    elif tag == "AnlageStromSpeicher":
+                        spe_nr = record.get("MaStRNummer")
+                        if spe_nr:
+                            raw_cap = record.get("NutzbareSpeicherkapazitaet")
+                            try:
+                                cap = float(raw_cap.replace(",", ".")) if raw_cap else None
+                            except (ValueError, AttributeError):
+                                cap = None
+                            spe_to_cap[spe_nr] = cap
+                        record = None
+                        elem.clear()
+    return spe_to_cap
+
+
 def _read_capacity_from_zip(zip_path):
     """
     Read NutzbareSpeicherkapazitaet from AnlagenStromSpeicher_*.xml inside the zip.
 
     open_mastr no longer imports these files into storage_units, so we read the
-    zip directly. Returns a dict {MaStRNummer -> capacity_float_or_None}.
+    zip directly. The export splits the data across many XML files, so each one
+    is parsed in its own worker process. Returns a dict
+    {MaStRNummer -> capacity_float_or_None}.
     """
-    spe_to_cap = {}
     with zipfile.ZipFile(zip_path) as zf:
         all_names = zf.namelist()
-        files = sorted(n for n in all_names if Path(n).name.startswith("AnlagenStromSpeicher_"))
-        log(f"Reading capacity from {len(files)} AnlagenStromSpeicher XML files in zip "
-            f"(zip contains {len(all_names)} files total)...")
-        for fn in files:
-            with zf.open(fn) as raw:
-                reader = codecs.getreader("utf-16")(raw)
-                record = None
-                for event, elem in xml_iterparse(reader, events=("start", "end")):
-                    tag = elem.tag
-                    if event == "start" and tag == "AnlageStromSpeicher":
-                        record = {}
-                    elif event == "end" and record is not None:
-                        if tag in ("MaStRNummer", "NutzbareSpeicherkapazitaet"):
-                            record[tag] = elem.text
-                            elem.clear()
-                        elif tag == "AnlageStromSpeicher":
-                            spe_nr = record.get("MaStRNummer")
-                            if spe_nr:
-                                raw_cap = record.get("NutzbareSpeicherkapazitaet")
-                                try:
-                                    cap = float(raw_cap.replace(",", ".")) if raw_cap else None
-                                except (ValueError, AttributeError):
-                                    cap = None
-                                spe_to_cap[spe_nr] = cap
-                            record = None
-                            elem.clear()
+    files = sorted(n for n in all_names if Path(n).name.startswith("AnlagenStromSpeicher_"))
+    log(f"Reading capacity from {len(files)} AnlagenStromSpeicher XML files in zip "
+        f"(zip contains {len(all_names)} files total)...")
+
+    spe_to_cap = {}
+    if files:
+        workers = min(len(files), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for partial in pool.map(_parse_capacity_file, [str(zip_path)] * len(files), files):
+                spe_to_cap.update(partial)
 
     with_cap = sum(1 for v in spe_to_cap.values() if v is not None)
     log(f"Capacity loaded: {len(spe_to_cap):,} Anlagen, {with_cap:,} ({100*with_cap/max(len(spe_to_cap),1):.1f}%) have NutzbareSpeicherkapazitaet")
     return spe_to_cap
 
 
+def _parse_storage_units_file(zip_path, member):
+    """
+    Parse one EinheitenStromSpeicher_*.xml member of the zip.
+
+    Runs in a worker process like _parse_capacity_file. Collects only the
+    NEEDED_COLUMNS fields and returns plain dicts of raw strings.
+    """
+    needed = frozenset(NEEDED_COLUMNS)
+    rows = []
+    with zipfile.ZipFile(zip_path) as zf:
+        with zf.open(member) as raw:
+            reader = codecs.getreader("utf-16")(raw)
+            record = None
+            for event, elem in xml_iterparse(reader, events=("start", "end")):
+                tag = elem.tag
+                if event == "start" and tag == "EinheitStromSpeicher":
+                    record = {}
+                elif event == "end" and record is not None:
+                    if tag == "EinheitStromSpeicher":
+                        rows.append(record)
+                        record = None
+                        elem.clear()
+                    elif tag in needed:
+                        record[tag] = elem.text
+                        elem.clear()
+    return rows
+
+
+def _read_catalog_map(zip_path):
+    """
+    Map Katalogwerte IDs to their display text from the bulk export zip.
+
+    The export stores closed-vocabulary fields as numeric IDs whose texts
+    live in Katalogwerte_*.xml; this is the decoding open_mastr's cleansing
+    pass applies, done once from the zip instead.
+    """
+    mapping = {}
+    with zipfile.ZipFile(zip_path) as zf:
+        members = [n for n in zf.namelist() if Path(n).name.lower().startswith("katalogwerte")]
+        for member in members:
+            with zf.open(member) as raw:
+                reader = codecs.getreader("utf-16")(raw)
+                value_id = value_text = None
+                for event, elem in xml_iterparse(reader, events=("end",)):
+                    tag = elem.tag.lower()
+                    if tag == "id":
+                        value_id = elem.text
+                    elif tag == "wert":
+                        value_text = elem.text
+                    elif tag == "katalogwert":
+                        if value_id is not None and value_text is not None:
+                            mapping[value_id] = value_text
+                        value_id = value_text = None
+                    elem.clear()
+    return mapping
+
+
+def _read_units_from_zip(zip_path):
+    """
+    Parse EinheitenStromSpeicher_*.xml directly from the bulk export zip.
+
+    Full loads skip the SQLite round-trip: the unit records go straight into
+    a DataFrame, with catalog IDs decoded via Katalogwerte so the frame
+    matches what the cleansed storage_extended table would contain. Numeric
+    fields are converted here because the plausibility checks do arithmetic
+    on them. Returns None when the zip carries no Katalogwerte (the caller
+    then falls back to the cleansed SQLite read).
+    """
+    catalog = _read_catalog_map(zip_path)
+    if not catalog:
+        log("No Katalogwerte found in zip; cannot decode catalog fields.", level="WARNING")
+        return None
+    log(f"Loaded {len(catalog):,} Katalogwerte for catalog decoding.")
+
+    with zipfile.ZipFile(zip_path) as zf:
+        all_names = zf.namelist()
+    files = sorted(n for n in all_names if Path(n).name.startswith("EinheitenStromSpeicher"))
+    log(f"Parsing {len(files)} EinheitenStromSpeicher XML files from zip...")
+
+    rows = []
+    if files:
+        workers = min(len(files), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for partial in pool.map(_parse_storage_units_file, [str(zip_path)] * len(files), files):
+                rows.extend(partial)
+
+    df = pd.DataFrame(rows)
+    # Decode catalog IDs to text; values missing from the catalog (or
+    # already textual) pass through unchanged.
+    for col in set(CATALOG_COLUMNS) & set(df.columns):
+        df[col] = df[col].map(catalog).fillna(df[col])
+    for col in {"Bruttoleistung", "Nettonennleistung", "NutzbareSpeicherkapazitaet",
+                "PumpbetriebLeistungsaufnahme", "ZugeordneteWirkleistungWechselrichter",
+                "Breitengrad", "Laengengrad"} & set(df.columns):
+        df[col] = pd.to_numeric(df[col].str.replace(",", ".", regex=False), errors="coerce")
+    return df
+
+
+def _sqlite_connect(db):
+    """
+    Open a raw sqlite3 connection to the open-mastr database.
+
+    pd.read_sql over the SQLAlchemy engine routes every row through
+    SQLAlchemy's result machinery; reading over the plain DBAPI connection
+    skips that layer, which is several times faster for bulk reads.
+    """
+    return sqlite3.connect(db.engine.url.database)
+
+
 def download_storage_data():
     """
     Download storage data from MaStR and return a DataFrame.
@@ -126,6 +377,9 @@ def download_storage_data():
 
     if not SKIP_DOWNLOAD:
         log("Downloading storage data from MaStR...")
+        # Cleansing must stay on: it decodes the catalog IDs into the text
+        # values every SQLite read path compares against. The zip fast path
+        # below does its own decoding and bypasses the tables entirely.
         db.download(data=["storage"], bulk_cleansing=True)
     else:
         log("Skipping download (data pre-loaded by parent).")
@@ -133,35 +387,49 @@ def download_storage_data():
     available_tables = sa_inspect(db.engine).get_table_names()
     log(f"Available SQLite tables: {available_tables}")
 
-    probe = pd.read_sql("SELECT * FROM storage_extended LIMIT 1", con=db.engine)
-    all_columns = probe.columns.tolist()
-    date_col = next(
-        (c for c in ["DatumLetzteAktualisierung", "date_last_update"] if c in all_columns),
-        None,
-    )
+    con = _sqlite_connect(db)
 
-    log("Loading storage data from database...")
-    if not FULL_LOAD and date_col:
-        threshold_str = THRESHOLD_DATE.strftime("%Y-%m-%d")
-        log(f"Incremental filter: {date_col} >= {threshold_str}")
-        df = pd.read_sql(
-            f"SELECT * FROM storage_extended WHERE {date_col} >= '{threshold_str}'",
-            con=db.engine,
+    zip_path = _find_latest_zip() if FULL_LOAD else None
+    df = None
+    if zip_path is not None:
+        log(f"Full mode: parsing units directly from {zip_path.name} (bypassing storage_extended).")
+        df = _read_units_from_zip(zip_path)
+        if df is not None:
+            log(f"Loaded {len(df):,} storage units from zip.")
+        else:
+            log("Falling back to the cleansed storage_extended table.", level="WARNING")
+    if df is None:
+        probe = pd.read_sql("SELECT * FROM storage_extended LIMIT 1", con=con)
+        all_columns = probe.columns.tolist()
+        date_col = next(
+            (c for c in ["DatumLetzteAktualisierung", "date_last_update"] if c in all_columns),
+            None,
         )
-        log(f"Loaded {len(df):,} storage units updated since {threshold_str}.")
-    elif not FULL_LOAD:
-        log("No update-date column found; loading all entries.", level="WARNING")
-        df = pd.read_sql("SELECT * FROM storage_extended", con=db.engine)
-        log(f"Loaded {len(df):,} storage units.")
-    else:
-        log("Full mode: reading storage_extended in chunks...")
-        chunks = []
-        chunk_size = 100_000
-        for chunk in pd.read_sql("SELECT * FROM storage_extended", con=db.engine, chunksize=chunk_size):
-            chunks.append(chunk)
-            log(f"  ...read {sum(len(c) for c in chunks):,} rows so far")
-        df = pd.concat(chunks, ignore_index=True)
-        log(f"Loaded {len(df):,} storage units total.")
+
+        select_cols = ", ".join(f'"{c}"' for c in NEEDED_COLUMNS if c in all_columns)
+
+        log("Loading storage data from database...")
+        if not FULL_LOAD and date_col:
+            threshold_str = THRESHOLD_DATE.strftime("%Y-%m-%d")
+            log(f"Incremental filter: {date_col} >= {threshold_str}")
+            df = pd.read_sql(
+                f"SELECT {select_cols} FROM storage_extended WHERE {date_col} >= '{threshold_str}'",
+                con=con,
+            )
+            log(f"Loaded {len(df):,} storage units updated since {threshold_str}.")
+        elif not FULL_LOAD:
+            log("No update-date column found; loading all entries.", level="WARNING")
+            df = pd.read_sql(f"SELECT {select_cols} FROM storage_extended", con=con)
+            log(f"Loaded {len(df):,} storage units.")
+        else:
+            log("Full mode without zip: reading storage_extended in chunks...", level="WARNING")
+            chunks = []
+            chunk_size = 100_000
+            for chunk in pd.read_sql(f"SELECT {select_cols} FROM storage_extended", con=con, chunksize=chunk_size):
+                chunks.append(chunk)
+                log(f"  ...read {sum(len(c) for c in chunks):,} rows so far")
+            df = pd.concat(chunks, ignore_index=True)
+            log(f"Loaded {len(df):,} storage units total.")
 
     # Merge NutzbareSpeicherkapazitaet from storage_units (populated via the
     # "storage_units" open_mastr download type → AnlagenStromSpeicher XML).
@@ -170,7 +438,7 @@ def download_storage_data():
     if "storage_units" in available_tables and "SpeMastrNummer" in df.columns:
         storage_units = pd.read_sql(
             "SELECT MastrNummer, NutzbareSpeicherkapazitaet FROM storage_units",
-            con=db.engine,
+            con=con,
         )
         if len(storage_units) > 0:
             log(f"Loaded {len(storage_units):,} entries from storage_units table.")
@@ -195,6 +463,7 @@ def download_storage_data():
             else:
                 log("No zip found either. NutzbareSpeicherkapazitaet will be NULL — check parent download.", level="WARNING")
 
+    con.close()
     return df, db
 
 
@@ -210,36 +479,43 @@ def apply_plausibility_checks(df):
     entries. Non-battery technologies pass through with the technology name
     as their category.
     """
-    batteries = df[df["Technologie"] == "Batterie"].copy()
-    non_batteries = df[df["Technologie"] != "Batterie"].copy()
+    # Evaluate the technology comparison once and reuse the mask for both
+    # partitions instead of scanning the column twice.
+    is_battery = df["Technologie"] == "Batterie"
+    batteries = df[is_battery].copy()
+    non_batteries = df[~is_battery].copy()
     non_batteries["category"] = non_batteries["Technologie"]
 
     n_start = len(batteries)
     log(f"Battery entries before filtering: {n_start}")
 
+    # Filters 1, 2 and 4 are row-independent, so evaluate them as boolean
+    # masks on the unfiltered frame and materialize the filtered copy once.
     # Filter 1: Batterietechnologie must be defined
-    batteries = batteries.dropna(subset=["Batterietechnologie"])
-    log(f"Filter 1 (battery technology defined): {len(batteries)} kept, {n_start - len(batteries)} dropped")
-
+    f1 = batteries["Batterietechnologie"].notna()
     # Filter 2: E/P ratio between 0.1 h and 15 h
     ep = batteries["NutzbareSpeicherkapazitaet"] / batteries["Nettonennleistung"]
-    batteries = batteries[ep.between(0.1, 15)]
-    log(f"Filter 2 (E/P ratio 0.1–15 h): {len(batteries)} kept, {n_start - len(batteries)} total dropped so far")
-
-    # Filter 3: Sort by commissioning date
-    batteries["Inbetriebnahmedatum"] = pd.to_datetime(batteries["Inbetriebnahmedatum"], errors="coerce")
-    batteries = batteries.sort_values("Inbetriebnahmedatum").reset_index(drop=True)
-
+    f2 = ep.between(0.1, 15)
     # Filter 4: Remove unreviewed large-capacity entries (> 1000 kWh, not grid-reviewed)
     # Exception: OET manually restores SSE978006940074
-    mask_remove = (
+    f4_remove = (
         (batteries["NutzbareSpeicherkapazitaet"] > 1000)
         & (batteries["NetzbetreiberpruefungStatus"] == "0")
         & (~batteries["SpeMastrNummer"].isin(_OET_FILTER4_EXCEPTIONS))
     )
-    batteries = batteries[~mask_remove]
+
+    n_f1 = int(f1.sum())
+    n_f12 = int((f1 & f2).sum())
+    log(f"Filter 1 (battery technology defined): {n_f1} kept, {n_start - n_f1} dropped")
+    log(f"Filter 2 (E/P ratio 0.1–15 h): {n_f12} kept, {n_start - n_f12} total dropped so far")
+
+    batteries = batteries[f1 & f2 & ~f4_remove].copy()
     log(f"Filter 4 (large unreviewed removed): {len(batteries)} kept")
 
+    # Filter 3: Sort by commissioning date
+    batteries["Inbetriebnahmedatum"] = pd.to_datetime(batteries["Inbetriebnahmedatum"], errors="coerce")
+    batteries = batteries.sort_values("Inbetriebnahmedatum").reset_index(drop=True)
+
     # Categorise by capacity (exactly as OET's pd.cut)
     batteries["category"] = pd.cut(
         batteries["NutzbareSpeicherkapazitaet"],
@@ -247,6 +523,14 @@ def apply_plausibility_checks(df):
         labels=["Heimspeicher", "Gewerbespeicher", "Grossspeicher"],
     ).astype(str)
 
+    # One value_counts pass instead of one scan per category
+    counts = batteries["category"].value_counts()
+    log(
+        f"Categorization: {counts.get('Heimspeicher', 0)} Heim, "
+        f"{counts.get('Gewerbespeicher', 0)} Gewerbe, "
+        f"{counts.get('Grossspeicher', 0)} Gross"
+    )
+
     result = pd.concat([batteries, non_batteries], ignore_index=True)
     log(f"Plausibility complete: {len(result)} records ({n_start - len(batteries)} batteries dropped)")
     return result
@@ -317,19 +601,27 @@ def map_to_directus_schema(df):
 
     mapped["country"] = "DE"
 
-    for col in {"power_kw", "net_power_kw", "usable_storage_capacity_kwh",
-                "pump_power_kw", "inverter_power_kw", "lat", "lon"} & set(mapped.columns):
-        mapped[col] = pd.to_numeric(
-            mapped[col].astype(str).str.replace(",", ".", regex=False), errors="coerce"
+    float_cols = list({"power_kw", "net_power_kw", "usable_storage_capacity_kwh",
+                       "pump_power_kw", "inverter_power_kw", "lat", "lon"} & set(mapped.columns))
+    if float_cols:
+        # Arrow-backed strings keep the decimal-comma replace in C instead of
+        # materializing a Python-object column per field.
+        mapped[float_cols] = (
+            mapped[float_cols]
+            .astype("string[pyarrow]")
+            .apply(lambda s: pd.to_numeric(s.str.replace(",", ".", regex=False), errors="coerce"))
         )
 
-    for col in {"commissioning_date", "shutdown_date", "planned_commissioning_date"} & set(mapped.columns):
-        ts = pd.to_datetime(mapped[col], errors="coerce")
-        mapped[col] = ts.dt.strftime("%Y-%m-%d").where(ts.notna(), None)
+    def _format_dates(s, fmt):
+        ts = pd.to_datetime(s, errors="coerce")
+        return ts.dt.strftime(fmt).where(ts.notna(), None)
 
-    for col in {"last_update"} & set(mapped.columns):
-        ts = pd.to_datetime(mapped[col], errors="coerce")
-        mapped[col] = ts.dt.strftime("%Y-%m-%dT%H:%M:%S").where(ts.notna(), None)
+    date_cols = list({"commissioning_date", "shutdown_date", "planned_commissioning_date"} & set(mapped.columns))
+    if date_cols:
+        mapped[date_cols] = mapped[date_cols].apply(_format_dates, fmt="%Y-%m-%d")
+
+    if "last_update" in mapped.columns:
+        mapped["last_update"] = _format_dates(mapped["last_update"], "%Y-%m-%dT%H:%M:%S")
 
     for col in {"high_voltage_connection"} & set(mapped.columns):
         na_mask = mapped[col].isna()
@@ -337,11 +629,10 @@ def map_to_directus_schema(df):
         mapped.loc[na_mask, col] = None
 
     if "status" in mapped.columns:
-        mapped["status"] = (
-            mapped["status"].astype(str)
-            .map(lambda v: STATUS_CODES.get(v, v))
-            .where(mapped["status"].notna(), None)
-        )
+        # EinheitBetriebsstatus is a closed value set, so map the dict
+        # directly instead of calling a Python lambda per row.
+        status = mapped["status"].astype(str)
+        mapped["status"] = status.map(STATUS_CODES).fillna(status).where(mapped["status"].notna(), None)
 
     string_cols = {
         "technology", "battery_technology", "pumped_storage_technology", "ac_dc_coupling",
@@ -349,46 +640,105 @@ def map_to_directus_schema(df):
         "grid_operator_review_status", "co_registered_solar_unit", "storage_mastr_number",
         "region", "postcode", "name", "energy_source", "feed_in_type", "operator_name", "category",
     }
-    for col in string_cols & set(mapped.columns):
-        na_mask = mapped[col].isna()
-        mapped.loc[~na_mask, col] = mapped.loc[~na_mask, col].astype(str)
-        mapped.loc[na_mask, col] = None
+    str_cols = list(string_cols & set(mapped.columns))
+    if str_cols:
+        block = mapped[str_cols]
+        mapped[str_cols] = block.astype(str).where(block.notna(), None)
 
-    mapped = mapped.astype(object).where(mapped.notna(), None)
-    records = mapped.to_dict("records")
-    log(f"Mapped {len(records)} records")
-    return records
+    # Stay columnar: the frame is handed to sync_to_directus as-is and only
+    # materialized into dicts one batch at a time (_records_from_frame), so
+    # the ~1.5 KB-per-dict record representation never exists for the whole
+    # dataset at once.
+    log(f"Mapped {len(mapped)} records")
+    return mapped
 
 
 # ---------------------------------------------------------------------------
 # Directus API helpers
 # ---------------------------------------------------------------------------
 
-def _normalize_ts(ts_str):
-    """Normalize a timestamp string to YYYY-MM-DDTHH:MM:SS for comparison."""
-    if not ts_str:
-        return None
-    return str(ts_str)[:19]
+def _records_from_frame(df_slice):
+    """Materialize one batch of dicts from the columnar frame (NaN/NaT -> None)."""
+    records = df_slice.to_dict("records")
+    for r in records:
+        for k, v in r.items():
+            if v is not None and pd.isna(v):
+                r[k] = None
+    return records
 
 
-def get_existing_ids(ids):
-    existing = set()
-    for i in range(0, len(ids), 100):
-        chunk = ids[i:i + 100]
-        try:
-            r = requests.get(
-                f"{DIRECTUS_URL}/items/{TABLE_NAME}",
-                headers=HEADERS,
-                params={"filter[id][_in]": ",".join(chunk), "fields": "id", "limit": -1},
-                timeout=60,
-            )
-            if r.status_code == 200:
-                existing.update(item["id"] for item in r.json().get("data", []))
-            else:
-                log(f"Error querying IDs: {r.status_code}", level="WARNING")
-        except Exception as e:
-            log(f"Error checking IDs: {e}", level="WARNING")
-    return existing
+def _count_table_rows():
+    """Total row count via a single aggregate query, or None on failure."""
+    try:
+        r = SESSION.get(
+            f"{DIRECTUS_URL}/items/{TABLE_NAME}",
+            headers=HEADERS,
+            params={"aggregate[count]": "*"},
+            timeout=60,
+        )
+        if r.status_code == 200:
+            data = _json_loads(r.content).get("data", [])
+            if data:
+                return int(data[0].get("count", 0))
+        log(f"Error counting rows: {r.status_code}", level="WARNING")
+    except Exception as e:
+        log(f"Error counting rows: {e}", level="WARNING")
+    return None
+
+
+def _fetch_all_pages(fields):
+    """
+    Fetch the given fields for every row in the table.
+
+    One aggregate count determines the page range, then up to MAX_WORKERS
+    pages are fetched concurrently over the shared session (pagination is
+    pure RTT, so the wall clock is otherwise pages x round-trip time).
+    Falls back to sequential pagination when the count is unavailable.
+    """
+    page_size = 10000
+
+    def fetch_page(page):
+        r = SESSION.get(
+            f"{DIRECTUS_URL}/items/{TABLE_NAME}",
+            headers=HEADERS,
+            params={"fields": fields, "limit": page_size, "offset": page * page_size},
+            timeout=120,
+        )
+        r.raise_for_status()
+        return _json_loads(r.content).get("data", [])
+
+    total = _count_table_rows()
+    items = []
+    if total is None:
+        page = 0
+        while True:
+            try:
+                data = fetch_page(page)
+            except Exception as e:
+                log(f"Error fetching page {page}: {e}", level="WARNING")
+                break
+            if not data:
+                break
+            items.extend(data)
+            if len(data) < page_size:
+                break
+            page += 1
+        return items
+
+    pages = (total + page_size - 1) // page_size
+    if pages:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, pages)) as pool:
+            for data in pool.map(fetch_page, range(pages)):
+                items.extend(data)
+    return items
+
+
+def get_all_directus_ids():
+    """Return the set of all record IDs currently in Directus."""
+    log("Fetching all existing IDs from Directus...")
+    ids = {item["id"] for item in _fetch_all_pages("id")}
+    log(f"ID fetch complete: {len(ids):,} records.")
+    return ids
 
 
 def batch_upsert(batch, op, max_retries=3):
@@ -397,8 +747,13 @@ def batch_upsert(batch, op, max_retries=3):
     url = f"{DIRECTUS_URL}/items/{TABLE_NAME}"
     for attempt in range(max_retries):
         try:
-            fn = requests.post if op == "insert" else requests.patch
-            r = fn(url, json=batch, headers=HEADERS, timeout=120)
+            fn = SESSION.post if op == "insert" else SESSION.patch
+            r = fn(
+                url,
+                data=_gzip_stream(_iter_json_array(batch)),
+                headers={**HEADERS, "Content-Encoding": "gzip"},
+                timeout=120,
+            )
             if r.status_code in [200, 201, 204]:
                 return len(batch)
             elif r.status_code == 503:
@@ -412,117 +767,119 @@ def batch_upsert(batch, op, max_retries=3):
     return 0
 
 
-def sync_to_directus(records, existing_meta=None):
+def sync_to_directus(df, existing_meta=None):
     """
+    df: the mapped columnar frame from map_to_directus_schema.
     existing_meta: dict {id -> last_update_str} (full mode) or None (incremental).
     In full mode, records whose last_update matches Directus are skipped.
+
+    Partitioning happens on vectorized masks; dicts are only materialized one
+    upload batch at a time.
     """
-    total_inserted = total_updated = total_skipped = 0
-    log(f"Syncing {len(records)} records to Directus...")
+    total_inserted = total_updated = 0
+    log(f"Syncing {len(df)} records to Directus...")
 
     if existing_meta is None:
-        # Incremental: check existence per batch
-        total_batches = (len(records) + BATCH_SIZE - 1) // BATCH_SIZE
-        for i in range(0, len(records), BATCH_SIZE):
-            batch_num = i // BATCH_SIZE + 1
-            batch = records[i:i + BATCH_SIZE]
-            existing = get_existing_ids([r["id"] for r in batch])
-            to_insert = [r for r in batch if r["id"] not in existing]
-            to_update = [r for r in batch if r["id"] in existing]
-            n_ins = batch_upsert(to_insert, "insert")
-            n_upd = batch_upsert(to_update, "update")
-            total_inserted += n_ins
-            total_updated += n_upd
-            log(
-                f"Incremental batch {batch_num}/{total_batches}: "
-                f"+{n_ins} inserted, ~{n_upd} updated "
-                f"(running total: {total_inserted} inserted, {total_updated} updated)"
-            )
+        # Incremental: one bulk ID fetch up front, then partition with a
+        # single isin mask instead of chunked filter[id][_in] queries.
+        existing = get_all_directus_ids()
+        in_existing = df["id"].isin(existing)
+        df_insert = df[~in_existing]
+        df_update = df[in_existing]
+        log(f"Incremental partition: {len(df_insert)} new, {len(df_update)} existing")
     else:
-        # Full: pre-partitioned by comparing last_update to skip unchanged records
-        existing_ids = set(existing_meta.keys())
-        to_insert = [r for r in records if r["id"] not in existing_ids]
-        to_update = []
-        for r in records:
-            if r["id"] in existing_ids:
-                if _normalize_ts(r.get("last_update")) != _normalize_ts(existing_meta[r["id"]]):
-                    to_update.append(r)
-                else:
-                    total_skipped += 1
+        # Full: compare last_update against Directus to skip unchanged
+        # records. Timestamps are normalized to their first 19 characters
+        # (YYYY-MM-DDTHH:MM:SS) on both sides; missing values compare as "".
+        known = df["id"].isin(existing_meta.keys())
+        if "last_update" in df.columns:
+            ours = df["last_update"].astype("string").str.slice(0, 19).fillna("")
+        else:
+            ours = pd.Series("", index=df.index)
+        theirs = df["id"].map(existing_meta).astype("string").str.slice(0, 19).fillna("")
+        changed = known & (ours != theirs)
+        df_insert = df[~known]
+        df_update = df[changed]
+        total_skipped = len(df) - len(df_insert) - len(df_update)
         log(
-            f"Full-mode partition: {len(to_insert)} new, {len(to_update)} changed, "
+            f"Full-mode partition: {len(df_insert)} new, {len(df_update)} changed, "
             f"{total_skipped} unchanged (skipped)"
         )
 
-        insert_batches = (len(to_insert) + BATCH_SIZE - 1) // BATCH_SIZE or 1
-        for i in range(0, len(to_insert), BATCH_SIZE):
-            batch_num = i // BATCH_SIZE + 1
-            n = batch_upsert(to_insert[i:i + BATCH_SIZE], "insert")
-            total_inserted += n
-            log(f"Insert batch {batch_num}/{insert_batches}: {n} records (total inserted: {total_inserted}/{len(to_insert)})")
+    insert_batches = (len(df_insert) + BATCH_SIZE - 1) // BATCH_SIZE or 1
+    for i in range(0, len(df_insert), BATCH_SIZE):
+        batch_num = i // BATCH_SIZE + 1
+        t0 = time.time()
+        n = batch_upsert(_records_from_frame(df_insert.iloc[i:i + BATCH_SIZE]), "insert")
+        total_inserted += n
+        log(f"Insert batch {batch_num}/{insert_batches}: {n} records in {time.time() - t0:.1f}s (total inserted: {total_inserted}/{len(df_insert)})")
 
-        update_batches = (len(to_update) + BATCH_SIZE - 1) // BATCH_SIZE or 1
-        for i in range(0, len(to_update), BATCH_SIZE):
-            batch_num = i // BATCH_SIZE + 1
-            n = batch_upsert(to_update[i:i + BATCH_SIZE], "update")
-            total_updated += n
-            log(f"Update batch {batch_num}/{update_batches}: {n} records (total updated: {total_updated}/{len(to_update)})")
+    update_batches = (len(df_update) + BATCH_SIZE - 1) // BATCH_SIZE or 1
+    for i in range(0, len(df_update), BATCH_SIZE):
+        batch_num = i // BATCH_SIZE + 1
+        t0 = time.time()
+        n = batch_upsert(_records_from_frame(df_update.iloc[i:i + BATCH_SIZE]), "update")
+        total_updated += n
+        log(f"Update batch {batch_num}/{update_batches}: {n} records in {time.time() - t0:.1f}s (total updated: {total_updated}/{len(df_update)})")
 
     return total_inserted, total_updated
 
 
 def get_all_directus_meta():
     """Return {id: last_update_str} for every record in Directus."""
-    meta = {}
-    page_size, offset = 10000, 0
     log("Fetching all existing IDs + last_update from Directus...")
-    while True:
-        try:
-            r = requests.get(
-                f"{DIRECTUS_URL}/items/{TABLE_NAME}",
-                headers=HEADERS,
-                params={"fields": "id,last_update", "limit": page_size, "offset": offset},
-                timeout=120,
-            )
-            if r.status_code == 200:
-                data = r.json().get("data", [])
-                if not data:
-                    break
-                for item in data:
-                    meta[item["id"]] = item.get("last_update")
-                log(f"  ...fetched {len(meta):,} records so far (offset {offset})")
-                if len(data) < page_size:
-                    break
-                offset += page_size
-            else:
-                log(f"Error fetching meta: {r.status_code}", level="WARNING")
-                break
-        except Exception as e:
-            log(f"Error fetching meta: {e}", level="WARNING")
-            break
+    meta = {item["id"]: item.get("last_update") for item in _fetch_all_pages("id,last_update")}
     log(f"Directus meta fetch complete: {len(meta):,} records")
     return meta
 
 
-def delete_stale_records(stale_ids):
+def delete_batch(ids):
+    """
+    Delete one batch of IDs with a single bulk DELETE request.
+
+    All retraction paths (stale-record removal, table clear) go through
+    this helper so deletion is always one request per batch, never per ID.
+    Returns the number of deleted records (0 on failure).
+    """
+    if not ids:
+        return 0
+    try:
+        r = SESSION.delete(
+            f"{DIRECTUS_URL}/items/{TABLE_NAME}", headers=HEADERS, json=list(ids), timeout=120
+        )
+        if r.status_code in [200, 204]:
+            return len(ids)
+        log(f"Batch delete error: {r.status_code} - {r.text[:200]}", level="ERROR")
+    except Exception as e:
+        log(f"Batch delete error: {e}", level="ERROR")
+    return 0
+
+
+def _delete_batches_concurrently(id_list):
+    """
+    Delete ID batches in parallel via delete_batch.
+
+    DELETE is idempotent and the batches are disjoint, so they can run
+    concurrently over the pooled session like the upload path does.
+    """
+    batches = [id_list[i:i + BATCH_SIZE] for i in range(0, len(id_list), BATCH_SIZE)]
     deleted = 0
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(batches))) as pool:
+        for i, n in enumerate(pool.map(delete_batch, batches), start=1):
+            deleted += n
+            if n:
+                log(f"Delete batch {i}/{len(batches)}: {n} records (total deleted: {deleted:,})")
+    return deleted
+
+
+def delete_stale_records(stale_ids):
     stale_list = list(stale_ids)
-    total_batches = (len(stale_list) + BATCH_SIZE - 1) // BATCH_SIZE or 1
+    if not stale_list:
+        log("No stale records to delete.")
+        return 0
+    total_batches = (len(stale_list) + BATCH_SIZE - 1) // BATCH_SIZE
     log(f"Deleting {len(stale_list)} stale records in {total_batches} batches...")
-    for i in range(0, len(stale_list), BATCH_SIZE):
-        batch_num = i // BATCH_SIZE + 1
-        batch = stale_list[i:i + BATCH_SIZE]
-        try:
-            r = requests.delete(
-                f"{DIRECTUS_URL}/items/{TABLE_NAME}", headers=HEADERS, json=batch, timeout=120
-            )
-            if r.status_code in [200, 204]:
-                deleted += len(batch)
-                log(f"Delete batch {batch_num}/{total_batches}: {len(batch)} records (total deleted: {deleted})")
-            else:
-                log(f"Delete batch {batch_num}/{total_batches} error: {r.status_code} - {r.text[:200]}", level="ERROR")
-        except Exception as e:
-            log(f"Delete batch {batch_num}/{total_batches} error: {e}", level="ERROR")
+    deleted = _delete_batches_concurrently(stale_list)
     log(f"Deleted {deleted} stale records.")
     return deleted
 
@@ -530,54 +887,14 @@ def delete_stale_records(stale_ids):
 def clear_table():
     """Delete every record from the Directus table in batches."""
     log("Fetching all IDs for table clear...")
-    all_ids = []
-    page_size, offset = 10000, 0
-    while True:
-        try:
-            r = requests.get(
-                f"{DIRECTUS_URL}/items/{TABLE_NAME}",
-                headers=HEADERS,
-                params={"fields": "id", "limit": page_size, "offset": offset},
-                timeout=120,
-            )
-            if r.status_code == 200:
-                data = r.json().get("data", [])
-                if not data:
-                    break
-                all_ids.extend(item["id"] for item in data)
-                log(f"  ...fetched {len(all_ids):,} IDs so far")
-                if len(data) < page_size:
-                    break
-                offset += page_size
-            else:
-                log(f"Error fetching IDs for clear: {r.status_code}", level="WARNING")
-                break
-        except Exception as e:
-            log(f"Error fetching IDs for clear: {e}", level="WARNING")
-            break
+    all_ids = list(get_all_directus_ids())
 
     if not all_ids:
         log("Table is already empty.")
         return 0
 
     log(f"Deleting {len(all_ids):,} records...")
-    deleted = 0
-    total_batches = (len(all_ids) + BATCH_SIZE - 1) // BATCH_SIZE
-    for i in range(0, len(all_ids), BATCH_SIZE):
-        batch_num = i // BATCH_SIZE + 1
-        batch = all_ids[i:i + BATCH_SIZE]
-        try:
-            r = requests.delete(
-                f"{DIRECTUS_URL}/items/{TABLE_NAME}", headers=HEADERS, json=batch, timeout=120
-            )
-            if r.status_code in [200, 204]:
-                deleted += len(batch)
-                log(f"Clear batch {batch_num}/{total_batches}: {len(batch)} deleted (total: {deleted:,})")
-            else:
-                log(f"Clear batch {batch_num}/{total_batches} error: {r.status_code} - {r.text[:200]}", level="ERROR")
-        except Exception as e:
-            log(f"Clear batch {batch_num}/{total_batches} error: {e}", level="ERROR")
-
+    deleted = _delete_batches_concurrently(all_ids)
     log(f"Table cleared: {deleted:,} records deleted.")
     return deleted
 
@@ -619,8 +936,8 @@ def main():
             return
 
         df = apply_plausibility_checks(df)
-        records = map_to_directus_schema(df)
-        log(f"Prepared {len(records)} records for Directus sync.")
+        mapped = map_to_directus_schema(df)
+        log(f"Prepared {len(mapped)} records for Directus sync.")
 
         total_deleted = 0
         if REBUILD:
@@ -632,10 +949,10 @@ def main():
         else:
             existing_meta = None
 
-        total_inserted, total_updated = sync_to_directus(records, existing_meta=existing_meta)
+        total_inserted, total_updated = sync_to_directus(mapped, existing_meta=existing_meta)
 
         if FULL_LOAD and not REBUILD:
-            raw_ids = {r["id"] for r in records if r.get("id")}
+            raw_ids = set(mapped["id"].dropna())
             stale_ids = set(existing_meta.keys()) - raw_ids
             if stale_ids:
                 total_deleted = delete_stale_records(stale_ids)
@@ -646,7 +963,7 @@ def main():
         slack_log(
             f"Storage-Sync abgeschlossen in {duration}s\n"
             f"- Modus: {mode}\n"
-            f"- Nach Plausibilitaet: {len(records)}\n"
+            f"- Nach Plausibilitaet: {len(mapped)}\n"
             f"- Eingefuegt: {total_inserted}\n"
             f"- Aktualisiert: {total_updated}"
             + (f"\n- Geloescht: {total_deleted}" if FULL_LOAD else ""),
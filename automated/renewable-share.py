@@ -1,11 +1,17 @@
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import logging
-from datetime import datetime
-import statistics
+import pickle
+from datetime import datetime, timedelta
+from pathlib import Path
+import pandas as pd
+import numpy as np
 from dotenv import load_dotenv
 import os
 from slack_logger import slack_log
 from time import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 # Load from the nearest .env file (searches parent directories too)
 load_dotenv()
@@ -23,6 +29,24 @@ FIFTEEN_MIN_API_URL = "https://api.energy-charts.info/signal?country={country}"
 
 TABLE_NAME = 'energy_renewable_share'
 
+# Key set persisted between runs: historical rows never change, so only the
+# last KEY_CACHE_DAYS need re-fetching from Directus on scheduled runs.
+KEY_CACHE_PATH = Path(__file__).parent / "cache" / "renewable_share_keys.pkl"
+KEY_CACHE_DAYS = 7
+
+# One pooled session for all HTTP calls (energy-charts and Directus):
+# persistent connections amortize the TCP+TLS handshake across requests,
+# and the adapter retries transient failures with backoff.
+SESSION = requests.Session()
+SESSION.mount(
+    'https://',
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504]),
+    ),
+)
+
 # =====================================
 # Logging Setup
 # =====================================
@@ -31,9 +55,11 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # =====================================
 # Normalization Helper
 # =====================================
+@lru_cache(maxsize=200_000)
 def normalize_period(period_str, category):
     """
     Normalize the period string for comparison.
+    Cached: the same period strings recur across categories and runs.
     
     For 15min data, convert to "YYYY-MM-DD HH:MM:SS" (removing any T, Z, or microseconds).
     For daily (or weekly/monthly/yearly) data, use the date part "YYYY-MM-DD".
@@ -42,21 +68,14 @@ def normalize_period(period_str, category):
         return ""
     
     if category == "15min":
-        # If the period string is in ISO format, e.g. "2025-02-02T13:48:23.000Z", replace T and remove Z.
-        if "T" in period_str:
-            period_str = period_str.replace("T", " ").replace("Z", "")
-        # Try parsing with microseconds, then without.
+        # fromisoformat parses ISO/RFC3339 forms in C — with or without
+        # microseconds — so no strptime exception ladder is needed. The Z
+        # suffix becomes an explicit UTC offset for parsing.
         try:
-            dt = datetime.strptime(period_str, "%Y-%m-%d %H:%M:%S.%f")
+            dt = datetime.fromisoformat(period_str.replace("Z", "+00:00"))
         except ValueError:
-            try:
-                dt = datetime.strptime(period_str, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                dt = None
-        if dt:
-            return dt.strftime("%Y-%m-%d %H:%M:%S")
-        else:
-            return period_str  # fallback
+            return period_str.replace("T", " ").replace("Z", "")  # fallback
+        return dt.strftime("%Y-%m-%d %H:%M:%S")
     else:
         # For other categories, we want just the date (first 10 characters)
         if "T" in period_str:
@@ -64,6 +83,41 @@ def normalize_period(period_str, category):
         else:
             return period_str[:10]
 
+def build_keys(items):
+    """
+    Build the (normalized period, uppercase country, category) key for a
+    batch of records in one vectorized pass.
+
+    Equivalent to calling normalize_period/uppercase_country per record, but
+    the 15min timestamp parsing runs through pandas' C parser over the whole
+    column instead of one strptime call (plus exception fallback) per record.
+    """
+    if not items:
+        return []
+    periods = pd.Series([item.get('period') or "" for item in items], dtype="object")
+    categories = pd.Series([item.get('category') for item in items], dtype="object")
+    countries = [uppercase_country(item.get('country')) for item in items]
+
+    # Default path (day/week/month/year): just the date part.
+    normalized = periods.str.split("T").str[0].str.slice(0, 10)
+
+    is_15min = categories == "15min"
+    if is_15min.any():
+        raw = periods[is_15min]
+        dt = pd.to_datetime(
+            raw.str.replace("T", " ", regex=False).str.replace("Z", "", regex=False),
+            errors="coerce",
+        )
+        normalized_15 = dt.dt.strftime("%Y-%m-%d %H:%M:%S")
+        bad = dt.isna()
+        if bad.any():
+            # Rows the C parser rejects go through the scalar helper, so the
+            # vectorized path shares its fallback instead of duplicating it.
+            normalized_15[bad] = raw[bad].map(lambda p: normalize_period(p, "15min"))
+        normalized[is_15min] = normalized_15
+
+    return list(zip(normalized, countries, categories))
+
 # =====================================
 # Helper Functions
 # =====================================
@@ -75,6 +129,7 @@ def convert_unix_to_datetime_str(unix_ts):
     # Returns datetime string as "YYYY-MM-DD HH:MM:SS"
     return datetime.utcfromtimestamp(unix_ts).strftime('%Y-%m-%d %H:%M:%S')
 
+@lru_cache(maxsize=4096)
 def uppercase_country(country_code):
     return country_code.upper() if country_code else None
 
@@ -85,7 +140,7 @@ def fetch_all_years_daily_data(country):
         url = DAILY_API_URL.format(country=country, year=current_year)
         logging.info(f"Fetching daily data for {country} in {current_year}...")
         try:
-            resp = requests.get(url, timeout=10)
+            resp = SESSION.get(url, timeout=10)
             resp.raise_for_status()
             data = resp.json()
             days = data.get('days', [])
@@ -94,16 +149,16 @@ def fetch_all_years_daily_data(country):
                 logging.info(f"No data for {country} in {current_year}. Stopping.")
                 break  # No more data available for this year
             
-            records.extend([
-                {
-                    "period": convert_date_format(d),  # e.g. "2025-02-02"
+            uc_country = uppercase_country(country)
+            for d, s in zip(days, values):
+                period = convert_date_format(d)  # e.g. "2025-02-02"
+                records.append({
+                    "period": period,
                     "value": s,
-                    "country": uppercase_country(country),
+                    "country": uc_country,
                     "category": "day",
-                    "year": convert_date_format(d)[:4]
-                }
-                for d, s in zip(days, values)
-            ])
+                    "year": period[:4]
+                })
             current_year -= 1  # Fetch the previous year
         except requests.exceptions.RequestException as e:
             logging.error(f"Error fetching daily data for {country} in {current_year}: {e}")
@@ -111,28 +166,53 @@ def fetch_all_years_daily_data(country):
     
     return records
 
-def calculate_rolling_averages(data, window_size, category):
-    """Calculate rolling averages over a given window size."""
-    rolling_records = []
-    sorted_data = sorted(data, key=lambda x: x['period'])
-    for i in range(len(sorted_data) - window_size + 1):
-        window = sorted_data[i:i + window_size]
-        avg_value = statistics.mean([entry['value'] for entry in window])
-        rolling_records.append({
-            "period": sorted_data[i + window_size - 1]['period'],  # For day/week/month/year, remains "YYYY-MM-DD"
+def _rolling_from_sorted(sorted_data, cumsum, window_size, category):
+    """Build rolling-average records from a pre-sorted list and its cumsum array."""
+    if len(sorted_data) < window_size:
+        return []
+    # Sliding-window mean via cumulative sums: O(N) instead of O(N*W).
+    rolling = (cumsum[window_size:] - cumsum[:-window_size]) / window_size
+    return [
+        {
+            "period": entry['period'],  # For day/week/month/year, remains "YYYY-MM-DD"
             "value": avg_value,
             "category": category,
-            "year": sorted_data[i + window_size - 1]['year'],
-            "country": sorted_data[i + window_size - 1]['country']
-        })
-    return rolling_records
+            "year": entry['year'],
+            "country": entry['country']
+        }
+        for entry, avg_value in zip(sorted_data[window_size - 1:], rolling.tolist())
+    ]
+
+def _sorted_cumsum(data):
+    """Sort records by period and build the prepended cumulative-sum array."""
+    sorted_data = sorted(data, key=lambda x: x['period'])
+    values = np.fromiter((entry['value'] for entry in sorted_data), dtype=np.float64, count=len(sorted_data))
+    return sorted_data, np.cumsum(np.insert(values, 0, 0.0))
+
+def calculate_rolling_averages(data, window_size, category):
+    """Calculate rolling averages over a given window size."""
+    sorted_data, cumsum = _sorted_cumsum(data)
+    return _rolling_from_sorted(sorted_data, cumsum, window_size, category)
+
+def compute_all_rollings(daily_records):
+    """
+    Derive the weekly/monthly/yearly rolling averages from one shared sort
+    and cumulative-sum array instead of re-sorting the daily records per
+    window. Returns (weekly, monthly, yearly).
+    """
+    sorted_data, cumsum = _sorted_cumsum(daily_records)
+    return (
+        _rolling_from_sorted(sorted_data, cumsum, 7, "week"),
+        _rolling_from_sorted(sorted_data, cumsum, 30, "month"),
+        _rolling_from_sorted(sorted_data, cumsum, 365, "year"),
+    )
 
 def fetch_fifteen_min_data(country):
     """Fetch 15-min renewable share data with timeout handling."""
     url = FIFTEEN_MIN_API_URL.format(country=country)
     logging.info(f"Fetching 15-min data for {country}...")
     try:
-        resp = requests.get(url, timeout=10)
+        resp = SESSION.get(url, timeout=10)
         resp.raise_for_status()
     except requests.exceptions.RequestException as e:
         logging.error(f"Error fetching 15-min data for {country}: {e}")
@@ -143,91 +223,194 @@ def fetch_fifteen_min_data(country):
     values = data.get('share', [])
     uc_country = uppercase_country(country)
     
-    records = [
-        {
-            # New records use our conversion function that yields "YYYY-MM-DD HH:MM:SS"
-            "period": convert_unix_to_datetime_str(t),
+    records = []
+    for t, s in zip(times, values):
+        # New records use our conversion function that yields "YYYY-MM-DD HH:MM:SS"
+        period = convert_unix_to_datetime_str(t)
+        records.append({
+            "period": period,
             "value": s,
             "country": uc_country,
             "category": "15min",
-            "year": convert_unix_to_datetime_str(t)[:4]
-        }
-        for t, s in zip(times, values)
-    ]
+            "year": period[:4]
+        })
     
     logging.info(f"Fetched {len(records)} 15-min records for {country}.")
     return records
 
+def _load_cached_keys():
+    """Load the key set persisted by the last successful run, or None."""
+    try:
+        with open(KEY_CACHE_PATH, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError):
+        return None
+
+def _save_cached_keys(keys):
+    """Persist the key set for the next run's delta fetch."""
+    try:
+        KEY_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(KEY_CACHE_PATH, 'wb') as f:
+            pickle.dump(keys, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except (OSError, pickle.PickleError) as e:
+        logging.warning(f"Could not persist key cache: {e}")
+
 def fetch_existing_keys():
     """
     Fetch all existing records' unique keys (normalized period, country, category)
     from Directus using pagination.
+
+    Returns (keys, complete): complete is False when any page failed, so
+    callers know the set may be missing keys and must not persist it.
     """
-    keys = set()
-    page = 1
+    complete = True
+    base_url = f"{os.getenv('DIRECTUS_API_URL')}/items/{TABLE_NAME}"
     page_size = 1000
-    while True:
-        url = f"{os.getenv('DIRECTUS_API_URL')}/items/{TABLE_NAME}?fields=period,country,category&limit={page_size}&page={page}"
-        try:
-            response = requests.get(url, headers=HEADERS)
-            response.raise_for_status()
-            data = response.json().get('data', [])
+
+    # Historical rows never change, so reuse the key set persisted by the
+    # previous successful run and only re-fetch the recent window. A missing
+    # or unreadable cache falls back to the full fetch. Period strings are
+    # ISO-ordered, so a string _gte filter selects the recent rows.
+    cached = _load_cached_keys()
+    query_filter = {}
+    if cached is not None:
+        cutoff = (datetime.utcnow() - timedelta(days=KEY_CACHE_DAYS)).strftime('%Y-%m-%d')
+        query_filter = {'filter[period][_gte]': cutoff}
+        logging.info(f"Loaded {len(cached)} cached keys; fetching rows with period >= {cutoff}.")
+
+    def fetch_page(page):
+        response = SESSION.get(
+            base_url,
+            headers=HEADERS,
+            params={'fields': 'period,country,category', 'limit': page_size, 'page': page, **query_filter},
+            timeout=60,
+        )
+        response.raise_for_status()
+        return response.json().get('data', [])
+
+    # One aggregate count sizes the page range so the pages — each a pure
+    # HTTP round-trip — can be fetched concurrently instead of one by one.
+    total = None
+    try:
+        response = SESSION.get(base_url, headers=HEADERS, params={'aggregate[count]': '*', **query_filter}, timeout=60)
+        response.raise_for_status()
+        total = int(response.json()['data'][0]['count'])
+    except (requests.exceptions.RequestException, KeyError, IndexError, TypeError, ValueError) as e:
+        logging.warning(f"Could not get record count, falling back to sequential pagination: {e}")
+
+    items = []
+    if total is None:
+        page = 1
+        while True:
+            try:
+                data = fetch_page(page)
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Error fetching existing records on page {page}: {e}")
+                complete = False
+                break
             if not data:
                 break
-            for item in data:
-                # Normalize the period and ensure country is uppercase.
-                period_val = normalize_period(item.get('period', ""), item.get('category', ""))
-                country_val = uppercase_country(item.get('country'))
-                key = (period_val, country_val, item.get('category'))
-                keys.add(key)
+            items.extend(data)
             page += 1
+    elif total > 0:
+        num_pages = (total + page_size - 1) // page_size
+        try:
+            with ThreadPoolExecutor(max_workers=min(16, num_pages)) as pool:
+                for data in pool.map(fetch_page, range(1, num_pages + 1)):
+                    items.extend(data)
         except requests.exceptions.RequestException as e:
-            logging.error(f"Error fetching existing records on page {page}: {e}")
-            break
-    return keys
+            logging.error(f"Error fetching existing records: {e}")
+            complete = False
+
+    # Normalize all keys in one vectorized pass after pagination.
+    keys = set(build_keys(items))
+    return (keys if cached is None else cached | keys), complete
 
 def upsert_records(records):
     """
     Insert new records in Directus in batches, skipping duplicates.
-    
+
     Deduplication is based on the normalized key: (normalized period, uppercase country, category).
-    """
-    if not records:
-        logging.info("No records to upsert.")
-        return
 
+    Accepts any iterable: records are consumed in chunks, deduplicated, and
+    flushed to Directus in 1000-record batches, so peak memory stays at one
+    batch plus the key set no matter how many records are streamed in.
+    Returns (total records seen, records inserted).
+    """
     logging.info("Fetching existing records from Directus to avoid duplicates...")
-    existing_keys = fetch_existing_keys()
+    existing_keys, fetch_complete = fetch_existing_keys()
     logging.info(f"Fetched {len(existing_keys)} existing keys.")
 
-    new_keys = set()
-    new_records = []
-    for r in records:
-        norm_period = normalize_period(r.get("period", ""), r.get("category", ""))
-        key = (norm_period, uppercase_country(r.get("country")), r.get("category"))
-        if key in existing_keys or key in new_keys:
-            logging.debug(f"Duplicate record found, skipping: {key}")
-            continue
-        new_keys.add(key)
-        new_records.append(r)
-
-    logging.info(f"{len(new_records)} new records after filtering duplicates out of {len(records)} total records.")
-
-    # Batch new_records into groups of 1000 (or less)
     BATCH_SIZE = 1000
-    total_batches = (len(new_records) + BATCH_SIZE - 1) // BATCH_SIZE
-    for i in range(total_batches):
-        batch = new_records[i * BATCH_SIZE:(i + 1) * BATCH_SIZE]
-        logging.info(f"Inserting batch {i + 1}/{total_batches} with {len(batch)} records.")
-        url = f"{os.getenv('DIRECTUS_API_URL')}/items/{TABLE_NAME}"
+    url = f"{os.getenv('DIRECTUS_API_URL')}/items/{TABLE_NAME}"
+    new_keys = set()       # in-run dedup, regardless of insert outcome
+    inserted_keys = set()  # only keys whose batch was confirmed inserted
+    insert_failed = False
+    total_seen = 0
+    total_inserted = 0
+    batch_num = 0
+
+    def post_batch(batch):
+        # batch is a list of (record, key) pairs; keys are only recorded as
+        # existing once Directus confirms the insert, so a failed batch can
+        # be retried by a later run.
+        nonlocal total_inserted, batch_num, insert_failed
+        batch_num += 1
+        logging.info(f"Inserting batch {batch_num} with {len(batch)} records.")
         try:
-            response = requests.post(url, json=batch, headers=HEADERS)
+            response = SESSION.post(url, json=[r for r, _ in batch], headers=HEADERS)
             response.raise_for_status()
-            logging.info(f"Batch {i + 1} inserted successfully: {response.status_code} - {response.text}")
-        except requests.exceptions.HTTPError as e:
-            logging.error(f"HTTP error on batch {i + 1}: {response.status_code} - {response.text}")
+            total_inserted += len(batch)
+            inserted_keys.update(key for _, key in batch)
+            logging.info(f"Batch {batch_num} inserted successfully: {response.status_code}")
+        except requests.exceptions.HTTPError:
+            logging.error(f"HTTP error on batch {batch_num}: {response.status_code} - {response.text}")
+            insert_failed = True
         except requests.exceptions.RequestException as e:
-            logging.error(f"Error inserting batch {i + 1}: {e}")
+            logging.error(f"Error inserting batch {batch_num}: {e}")
+            insert_failed = True
+
+    def dedup(chunk):
+        kept = []
+        for r, key in zip(chunk, build_keys(chunk)):
+            if key in existing_keys or key in new_keys:
+                logging.debug(f"Duplicate record found, skipping: {key}")
+                continue
+            new_keys.add(key)
+            kept.append((r, key))
+        return kept
+
+    buffer = []
+    chunk = []
+    for r in records:
+        total_seen += 1
+        chunk.append(r)
+        if len(chunk) >= BATCH_SIZE:
+            buffer.extend(dedup(chunk))
+            chunk = []
+            while len(buffer) >= BATCH_SIZE:
+                post_batch(buffer[:BATCH_SIZE])
+                del buffer[:BATCH_SIZE]
+    if chunk:
+        buffer.extend(dedup(chunk))
+    while buffer:
+        post_batch(buffer[:BATCH_SIZE])
+        del buffer[:BATCH_SIZE]
+
+    if total_seen == 0:
+        logging.info("No records to upsert.")
+    else:
+        logging.info(f"{total_inserted} new records inserted out of {total_seen} total records.")
+        # Persist the merged key set so the next run only fetches the delta —
+        # but only when this run saw the complete ground truth and every
+        # insert succeeded. A cache written after a failure would record
+        # never-inserted keys as existing and block them forever; without a
+        # cache the next run re-fetches everything from Directus instead.
+        if fetch_complete and not insert_failed:
+            _save_cached_keys(existing_keys | inserted_keys)
+        else:
+            logging.warning("Skipping key-cache update after fetch/insert errors.")
+    return total_seen, total_inserted
 
 # =====================================
 # Main Script
@@ -238,24 +421,24 @@ if __name__ == "__main__":
     logging.info("Starting data update process...")
 
     try:
-        all_records = []
-
-        for country in COUNTRIES:
+        def fetch_country(country):
+            """Fetch and derive all record categories for one country."""
             daily_records = fetch_all_years_daily_data(country)
-            weekly_records = calculate_rolling_averages(daily_records, 7, "week")
-            monthly_records = calculate_rolling_averages(daily_records, 30, "month")
-            yearly_records = calculate_rolling_averages(daily_records, 365, "year")
+            weekly_records, monthly_records, yearly_records = compute_all_rollings(daily_records)
             fifteen_min_records = fetch_fifteen_min_data(country)
+            return daily_records + weekly_records + monthly_records + yearly_records + fifteen_min_records
 
-            all_records.extend(daily_records)
-            all_records.extend(weekly_records)
-            all_records.extend(monthly_records)
-            all_records.extend(yearly_records)
-            all_records.extend(fifteen_min_records)
+        def iter_all_records():
+            # Each country's fetches are independent and I/O-bound, so overlap
+            # them; the pooled SESSION handles the concurrent connections.
+            # Records are yielded per country so the upsert can flush batches
+            # while later countries are still being fetched.
+            with ThreadPoolExecutor(max_workers=min(8, len(COUNTRIES))) as pool:
+                for country_records in pool.map(fetch_country, COUNTRIES):
+                    yield from country_records
 
-        total = len(all_records)
+        total, inserted = upsert_records(iter_all_records())
         logging.info(f"Total records collected: {total}")
-        upsert_records(all_records)
 
         duration = round(time() - start_time)
         slack_log(f"✅ Datenaktualisierung renewable_share abgeschlossen in {duration}s\nGesamtanzahl Einträge: {total}", level="SUCCESS")
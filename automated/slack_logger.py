@@ -1,5 +1,8 @@
 # slack_logger.py
+import atexit
 import os
+import queue
+import threading
 import requests
 from datetime import datetime
 from dotenv import load_dotenv
@@ -8,6 +11,47 @@ load_dotenv()  # Ensure environment variables are loaded
 
 SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
 
+# Messages are handed to a daemon worker thread so callers never block on
+# the webhook round-trip; the worker reuses one session across posts.
+_queue = queue.Queue()
+_session = requests.Session()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _drain():
+    while True:
+        payload = _queue.get()
+        try:
+            if payload is None:  # flush sentinel
+                return
+            try:
+                response = _session.post(SLACK_WEBHOOK_URL, json=payload, timeout=10)
+                if response.status_code != 200:
+                    print(f"Slack error {response.status_code}: {response.text}")
+            except Exception as e:
+                print(f"Slack post exception: {e}")
+        finally:
+            _queue.task_done()
+
+
+def _ensure_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_drain, name="slack-logger", daemon=True)
+            _worker.start()
+
+
+@atexit.register
+def _flush():
+    """Deliver any queued messages before the interpreter exits."""
+    if _worker is None or not _worker.is_alive():
+        return
+    _queue.put(None)
+    _worker.join(timeout=10)
+
+
 def slack_log(message, level="INFO"):
     if not SLACK_WEBHOOK_URL:
         print("⚠️ No SLACK_WEBHOOK_URL configured. Not sending any logs.")
@@ -25,9 +69,5 @@ def slack_log(message, level="INFO"):
         "text": f"{emoji} *{level.upper()}* `{timestamp}`\n{message}"
     }
 
-    try:
-        response = requests.post(SLACK_WEBHOOK_URL, json=payload)
-        if response.status_code != 200:
-            print(f"Slack error {response.status_code}: {response.text}")
-    except Exception as e:
-        print(f"Slack post exception: {e}")
+    _queue.put(payload)
+    _ensure_worker()
@@ -1,4 +1,6 @@
+import io
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import pandas as pd
 import logging
 from dotenv import load_dotenv
@@ -9,6 +11,18 @@ load_dotenv()
 DIRECTUS_API_URL = os.getenv("DIRECTUS_API_URL")
 DIRECTUS_API_TOKEN = os.getenv("DIRECTUS_API_TOKEN")
 
+# One pooled session for all HTTP calls: the per-row existence check and
+# upsert loop would otherwise open a fresh TCP+TLS connection per request.
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504]),
+    ),
+)
+
 # Configure these variables to match the data you want to import
 DATASET_NAME = "nrg_ind_ren"
 TABLE_NAME = "mobility"
@@ -18,85 +32,124 @@ def fetch_eurostat_data(dataset_name):
     """Fetches dataset from Eurostat API."""
     logging.info(f"Fetching dataset: {dataset_name}")
     url = f"https://ec.europa.eu/eurostat/api/dissemination/sdmx/3.0/data/dataflow/ESTAT/{dataset_name}/1.0/*.*.*.*?compress=false&format=csvdata&formatVersion=2.0&lang=en&labels=name"
-    response = requests.get(url)
+    response = SESSION.get(url)
     response.raise_for_status()
-    
-    with open("eurostat_data.csv", "wb") as f:
-        f.write(response.content)
-    
+
     logging.info("Dataset successfully downloaded.")
-    return pd.read_csv("eurostat_data.csv")
+    # Parse straight from the response body — no disk round-trip — and only
+    # materialize the columns transform_data consumes. The callable usecols
+    # tolerates missing columns so transform_data's own check still reports
+    # them.
+    return pd.read_csv(
+        io.BytesIO(response.content),
+        usecols=lambda c: c in {"geo", "TIME_PERIOD", "OBS_VALUE", "nrg_bal"},
+    )
 
 def transform_data(df, category_name, source_name):
     """Transforms the dataset into the required long format and filters data."""
     logging.info("Transforming data into long format.")
-    if "geo" not in df.columns or "TIME_PERIOD" not in df.columns or "OBS_VALUE" not in df.columns or "nrg_bal" not in df.columns:
+    if not {"geo", "TIME_PERIOD", "OBS_VALUE", "nrg_bal"}.issubset(df.columns):
         logging.error("Required columns 'geo', 'TIME_PERIOD', 'OBS_VALUE', or 'nrg_bal' not found in dataset.")
         raise KeyError("Could not find the required columns in the dataset.")
-    
-    # Filter only rows where nrg_bal = 'REN'
-    df = df[df["nrg_bal"] == "REN_TRA"]
-    
-    df_long = df.rename(columns={"geo": "region", "TIME_PERIOD": "period", "OBS_VALUE": "value"})
-    df_long["unit"] = "Percentage"
-    df_long["category"] = category_name
-    df_long["source"] = source_name
-    df_long["note"] = ""
-    
-    # Ensure 'value' is numeric, convert invalid values to None
-    df_long["value"] = pd.to_numeric(df_long["value"], errors='coerce')
-    df_long = df_long.dropna(subset=["value"])  # Remove rows where value is NaN
-    
+
+    # Project rows (nrg_bal = 'REN_TRA') and columns in one .loc so every
+    # step below works on the smallest possible frame.
+    df = df.loc[df["nrg_bal"] == "REN_TRA", ["geo", "TIME_PERIOD", "OBS_VALUE"]].copy()
+
+    # Ensure the value is numeric and keep valid rows with a mask instead of
+    # a second dropna copy.
+    df["OBS_VALUE"] = pd.to_numeric(df["OBS_VALUE"], errors='coerce')
+    df = df[df["OBS_VALUE"].notna()]
+
+    # One rename plus one assign adds all constant columns in a single pass.
+    df_long = df.rename(columns={"geo": "region", "TIME_PERIOD": "period", "OBS_VALUE": "value"}).assign(
+        unit="Percentage", category=category_name, source=source_name, note=""
+    )
+
     logging.info("Data transformation complete.")
     return df_long[["region", "period", "unit", "category", "source", "value", "note"]]
 
-def row_exists(directus_url, table_name, region, period, category, headers):
-    """Check if a row already exists in the Directus API."""
-    query_url = f"{directus_url}/items/{table_name}?filter[region][_eq]={region}&filter[period][_eq]={period}&filter[category][_eq]={category}"
-    try:
-        response = requests.get(query_url, headers=headers)
-        if response.status_code == 200:
-            data = response.json()
-            if data and data.get('data'):
-                return data['data'][0]  # Return the existing row
-        return None
-    except Exception as e:
-        logging.error(f"Error checking if row exists: {e}")
-        return None
+def fetch_existing_map(directus_url, table_name, category, headers):
+    """
+    Prefetch all existing rows for the category as one paginated query,
+    keyed on (region, period, category) -> (id, value).
+
+    Replaces the per-row existence check, so the upsert makes O(pages)
+    read requests instead of one per DataFrame row.
+    """
+    existing = {}
+    page = 1
+    page_size = 1000
+    while True:
+        try:
+            response = SESSION.get(
+                f"{directus_url}/items/{table_name}",
+                headers=headers,
+                params={
+                    "fields": "id,region,period,category,value",
+                    "filter[category][_eq]": category,
+                    "limit": page_size,
+                    "page": page,
+                },
+            )
+            response.raise_for_status()
+            data = response.json().get("data", [])
+        except Exception as e:
+            logging.error(f"Error fetching existing rows on page {page}: {e}")
+            break
+        if not data:
+            break
+        for item in data:
+            key = (item.get("region"), str(item.get("period")), item.get("category"))
+            existing[key] = (item.get("id"), item.get("value"))
+        page += 1
+    logging.info(f"Prefetched {len(existing)} existing rows for category '{category}'.")
+    return existing
+
+BATCH_SIZE = 1000
 
 def upsert_to_directus(df, directus_url, directus_token, table_name):
-    """Upserts data into Directus."""
+    """Upserts data into Directus with batched inserts and updates."""
     logging.info("Starting data upsert to Directus.")
     headers = {"Authorization": f"Bearer {directus_token}", "Content-Type": "application/json"}
-    
-    for _, row in df.iterrows():
-        existing_row = row_exists(directus_url, table_name, row['region'], row['period'], row['category'], headers)
-        data = {
-            "region": row["region"],
-            "period": row["period"],
-            "unit": row["unit"],
-            "category": row["category"],
-            "source": row["source"],
-            "value": row["value"],
-            "note": row["note"]
-        }
-        
-        if existing_row:
-            # Update only if the value has changed
-            if float(existing_row.get("value", 0)) != row["value"]:
-                update_url = f"{directus_url}/items/{table_name}/{existing_row['id']}"
-                response = requests.patch(update_url, headers=headers, json=data)
-                if response.status_code in [200, 204]:
-                    logging.info(f"Successfully updated row: {data}")
-                else:
-                    logging.error(f"Failed to update row: {data}. Status code: {response.status_code}, Response: {response.text}")
+
+    existing = fetch_existing_map(directus_url, table_name, CATEGORY_NAME, headers)
+
+    to_insert = []
+    to_update = []
+    unchanged = 0
+    # The frame's columns already match the Directus schema, so the records
+    # from to_dict are the POST payloads directly — no per-row Series
+    # construction as with iterrows.
+    for data in df.to_dict(orient="records"):
+        existing_row = existing.get((data["region"], str(data["period"]), data["category"]))
+        if existing_row is None:
+            to_insert.append(data)
+        elif float(existing_row[1] or 0) != data["value"]:
+            # Bulk PATCH takes an array of records carrying their own id
+            to_update.append({"id": existing_row[0], **data})
         else:
-            insert_url = f"{directus_url}/items/{table_name}"
-            response = requests.post(insert_url, headers=headers, json=data)
-            if response.status_code in [200, 201]:
-                logging.info(f"Successfully inserted new row: {data}")
-            else:
-                logging.error(f"Failed to insert row: {data}. Status code: {response.status_code}, Response: {response.text}")
+            unchanged += 1
+
+    logging.info(f"Upsert partition: {len(to_insert)} new, {len(to_update)} changed, {unchanged} unchanged.")
+
+    url = f"{directus_url}/items/{table_name}"
+    for i in range(0, len(to_insert), BATCH_SIZE):
+        batch = to_insert[i:i + BATCH_SIZE]
+        response = SESSION.post(url, headers=headers, json=batch)
+        if response.status_code in [200, 201]:
+            logging.info(f"Inserted batch of {len(batch)} rows.")
+        else:
+            logging.error(f"Failed to insert batch. Status code: {response.status_code}, Response: {response.text}")
+
+    for i in range(0, len(to_update), BATCH_SIZE):
+        batch = to_update[i:i + BATCH_SIZE]
+        response = SESSION.patch(url, headers=headers, json=batch)
+        if response.status_code in [200, 204]:
+            logging.info(f"Updated batch of {len(batch)} rows.")
+        else:
+            logging.error(f"Failed to update batch. Status code: {response.status_code}, Response: {response.text}")
+
     logging.info("Data upsert to Directus completed.")
 
 def main():
@@ -4,6 +4,7 @@ import openai
 import sys
 import json
 import html
+import asyncio
 from pathlib import Path
 from time import sleep
 from dotenv import load_dotenv
@@ -25,6 +26,9 @@ openai.api_key = OPENAI_API_KEY
 
 OPENAI_MODEL = "gpt-4"
 
+# Max concurrent OpenAI requests (keeps us inside rate limits)
+OPENAI_CONCURRENCY = 8
+
 MAIN_TABLES = ["charts", "news", "glossary", "block_panel", "block_richtext", "block_teaser", "block_items", "block_toggle", "block_donation", "pages", "sites", "policies", "policies_attributes", "policies_updates"]
 
 directus_headers = HEADERS
@@ -55,12 +59,6 @@ def fetch_records(main_table):
     response.raise_for_status()
     return response.json().get("data", [])
 
-def find_translation(translations, target_lang):
-    for t in translations:
-        if t.get("languages_code", "").lower() == target_lang.lower():
-            return t
-    return None
-
 def get_translatable_fields(translation_record, main_table):
     exclude_fields = {"id", "languages_code", f"{main_table}_id", "created_at", "updated_at"}
     translatable = {}
@@ -82,6 +80,89 @@ def translate_json_structure(data, target_lang):
         return call_chatgpt_for_translation(data, target_lang)
     return data
 
+async def async_call_chatgpt_for_translation(client, text, target_lang):
+    """ Async variant of call_chatgpt_for_translation for concurrent use. """
+    system_message = (
+        f"You are a translation assistant. Your task is to translate text from any language into {target_lang.upper()} while preserving formatting, placeholders, and HTML tags. "
+        "Do NOT translate values where the key is 'key' or 'link'. Ensure correct spelling and grammar."
+    )
+
+    try:
+        response = await client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": text}
+            ],
+            temperature=0.3,
+            max_tokens=1500
+        )
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        print(f"❌ Error during translation: {e}")
+        return text  # Return original text if translation fails
+
+async def translate_fields_async(translatable_fields, target_lang, client=None):
+    """
+    Translate all fields of one record concurrently.
+
+    Each field is still one independent OpenAI round-trip, but they fly in
+    parallel (bounded by OPENAI_CONCURRENCY) instead of back to back, so a
+    record's wall time approaches its slowest field rather than the sum.
+    """
+    if client is None:
+        client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
+    semaphore = asyncio.Semaphore(OPENAI_CONCURRENCY)
+
+    async def translate_one(key, value):
+        async with semaphore:
+            return key, await async_call_chatgpt_for_translation(client, value, target_lang)
+
+    results = await asyncio.gather(*[translate_one(k, v) for k, v in translatable_fields.items()])
+    return dict(results)
+
+async def translate_fields_batched(translatable_fields, target_lang):
+    """
+    Translate all fields of one record with a single chat request.
+
+    The fields go out as one JSON object and the model returns the
+    translated object, so per-record latency is one round-trip instead of
+    one per field (and the system prompt's tokens are paid once). Falls
+    back to the concurrent per-field path when the response is not valid
+    JSON.
+
+    The client is created here, inside the running loop: each asyncio.run
+    in process_table spins up a fresh event loop, and a module-level
+    AsyncOpenAI client keeps its connection pool bound to the first loop,
+    so reusing it across runs fails with "Event loop is closed".
+    """
+    client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
+    system_message = (
+        f"You are a translation assistant. Translate all JSON string values from any language into {target_lang.upper()} "
+        "while preserving formatting, placeholders, and HTML tags. Keep every JSON key verbatim, and do NOT translate "
+        "values whose key is 'key' or 'link'. Respond with the translated JSON object only, no explanations."
+    )
+    try:
+        response = await client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": json.dumps(translatable_fields, ensure_ascii=False)}
+            ],
+            temperature=0.3,
+            max_tokens=3000
+        )
+        translated = json.loads(response.choices[0].message.content.strip())
+        if isinstance(translated, dict):
+            # Keep the original value for any field the model dropped.
+            return {key: translated.get(key, value) for key, value in translatable_fields.items()}
+        print("⚠️ Batched translation returned non-object JSON; falling back to per-field calls.")
+    except json.JSONDecodeError:
+        print("⚠️ Batched translation returned invalid JSON; falling back to per-field calls.")
+    except Exception as e:
+        print(f"⚠️ Batched translation failed ({e}); falling back to per-field calls.")
+    return await translate_fields_async(translatable_fields, target_lang, client=client)
+
 def call_chatgpt_for_translation(text, target_lang):
     """ Calls OpenAI GPT to translate a single string while preserving structure. """
     system_message = (
@@ -152,9 +233,11 @@ def process_table(main_table):
             print(f"⚠️ Record {record_id} in {main_table} has no translations; skipping.")
             continue
 
+        # One dict build per record instead of a linear scan per language.
+        by_lang = {t.get("languages_code", "").lower(): t for t in translations}
         base_translation = translations[0]
         for target_lang in TARGET_LANGUAGES:
-            if find_translation(translations, target_lang):
+            if target_lang in by_lang:
                 print(f"✔️ Record {record_id} already has a translation for {target_lang.upper()}.")
                 continue
 
@@ -164,9 +247,7 @@ def process_table(main_table):
                 print(f"⚠️ No translatable fields found for record {record_id}; skipping.")
                 continue
 
-            translated_fields = {}
-            for key, value in translatable_fields.items():
-                translated_fields[key] = call_chatgpt_for_translation(value, target_lang)
+            translated_fields = asyncio.run(translate_fields_batched(translatable_fields, target_lang))
 
             # Show translation preview
             print("\n--- TRANSLATION PREVIEW ---")